@@ -0,0 +1,201 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_data import LOCATIONS, generate_solar_data
+from schemas.prediction_schema import LocationData
+from services.ml_services import SolarPredictionService
+
+MODEL_PATH = 'models/solar_power_model_final.joblib'
+
+# Each worker process loads the model once and keeps it for every chunk it receives.
+_service = None
+
+
+def _init_worker(model_path):
+    global _service
+    _service = SolarPredictionService(model_path)
+
+
+def generate_archive(locations, year):
+    """
+    Builds a synthetic weather archive from the data generator, one site per location.
+
+    Each site carries its hourly weather in the same shape as the OpenWeather One Call
+    'hourly' payload (dt, temp, wind_speed, clouds), plus the simulated 'power_w' as ground truth.
+    """
+    sites = []
+    for location in locations:
+        df = generate_solar_data(
+            year=year,
+            city=location['city'],
+            state=location['state'],
+            latitude=location['latitude'],
+            longitude=location['longitude'],
+            timezone=location['timezone']
+        )
+        hourly = pd.DataFrame({
+            'dt': (df['Timestamp'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1),
+            'temp': df['Temperature_C'],
+            'wind_speed': df['Wind_Speed_mps'],
+            'clouds': df['Cloud_Cover_Percent'],
+            'power_w': df['Power_Output_W'],
+        })
+        sites.append({
+            'site': location['city'],
+            'latitude': location['latitude'],
+            'longitude': location['longitude'],
+            'tilt_angle': float(df['Tilt_Angle'].iloc[0]),
+            'azimuth_angle': float(df['Azimuth_Angle'].iloc[0]),
+            'timezone': location['timezone'],
+            'hourly': hourly.to_dict('records'),
+        })
+    return sites
+
+
+def load_archive(path):
+    """Loads a recorded weather archive: a JSON list of sites in the format produced by `generate_archive`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def _backtest_chunk(sites):
+    """
+    Replays a chunk of sites through the serving feature path and predicts every hour in one model call.
+    Returns the per-hour results and the seconds spent on the chunk.
+    """
+    start = time.perf_counter()
+    features, frames = [], []
+
+    for site in sites:
+        location_data = LocationData(
+            latitude=site['latitude'], longitude=site['longitude'],
+            tilt_angle=site['tilt_angle'], azimuth_angle=site['azimuth_angle'],
+            timezone=site.get('timezone')
+        )
+        hourly = pd.DataFrame.from_records(site['hourly'])
+        tz_str = _service._get_timezone_str(location_data.latitude, location_data.longitude, location_data.timezone)
+        times = pd.DatetimeIndex(pd.to_datetime(hourly['dt'], unit='s', utc=True)).tz_convert(tz_str)
+
+        features.append(_service._prepare_features_batch(
+            times, hourly['temp'], hourly['wind_speed'], hourly['clouds'], location_data
+        ))
+        frames.append(pd.DataFrame({
+            'site': site['site'],
+            'month': times.month,
+            'hour': times.hour,
+            'actual_w': hourly['power_w'].to_numpy(dtype=float) if 'power_w' in hourly else np.nan,
+        }))
+
+    predicted = _service.model.predict(pd.concat(features, ignore_index=True))
+    results = pd.concat(frames, ignore_index=True)
+    # Same clamp as the live endpoints: the model never reports negative power.
+    results['predicted_w'] = np.clip(predicted, 0, None)
+    return results, time.perf_counter() - start
+
+
+def _error_table(results, by):
+    table = results.groupby(by).agg(
+        n=('abs_error', 'size'),
+        mae_w=('abs_error', 'mean'),
+        mse=('sq_error', 'mean'),
+    )
+    table['rmse_w'] = np.sqrt(table.pop('mse'))
+    return table.round(2)
+
+
+def run_backtest(sites, model_path=MODEL_PATH, workers=None, chunk_size=None):
+    """
+    Runs the backtest over all sites, split into chunks across a process pool.
+
+    Returns MAE/RMSE tables per site, month and hour, the overall errors and throughput stats.
+    Hours without a recorded 'power_w' are predicted but left out of the error tables.
+    """
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps the pool busy when sites differ in length.
+    chunk_size = chunk_size or max(1, math.ceil(len(sites) / (workers * 4)))
+    chunks = [sites[i:i + chunk_size] for i in range(0, len(sites), chunk_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(model_path)
+        outputs = [_backtest_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            outputs = list(pool.map(_backtest_chunk, chunks))
+    wall_seconds = time.perf_counter() - start
+
+    results = pd.concat([chunk_results for chunk_results, _ in outputs], ignore_index=True)
+    scored = results.dropna(subset=['actual_w']).copy()
+    error = scored['predicted_w'] - scored['actual_w']
+    scored['abs_error'] = error.abs()
+    scored['sq_error'] = error ** 2
+
+    return {
+        'by_site': _error_table(scored, 'site'),
+        'by_month': _error_table(scored, 'month'),
+        'by_hour': _error_table(scored, 'hour'),
+        'overall': {
+            'mae_w': round(float(scored['abs_error'].mean()), 2),
+            'rmse_w': round(float(np.sqrt(scored['sq_error'].mean())), 2),
+        },
+        'throughput': {
+            'sites': len(sites),
+            'rows': len(results),
+            'chunks': len(chunks),
+            'workers': workers,
+            'wall_seconds': round(wall_seconds, 2),
+            'worker_seconds': round(sum(seconds for _, seconds in outputs), 2),
+            'rows_per_second': round(len(results) / wall_seconds, 1) if wall_seconds > 0 else float('inf'),
+        },
+    }
+
+
+# --- Main Execution Block ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a weather archive through the serving model offline.")
+    parser.add_argument('--archive', help="Recorded archive JSON. If omitted, a synthetic archive is generated.")
+    parser.add_argument('--year', type=int, default=2024, help="Year to generate when no archive is given.")
+    parser.add_argument('--save-archive', help="Write the generated archive to this JSON file.")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the trained model.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all CPUs).")
+    parser.add_argument('--chunk-size', type=int, default=None, help="Sites per chunk sent to a worker.")
+    parser.add_argument('--out', help="Directory to save the per-site/month/hour error tables as CSV.")
+    args = parser.parse_args()
+
+    if args.archive:
+        print(f"Loading weather archive from '{args.archive}'...")
+        sites = load_archive(args.archive)
+    else:
+        print(f"Generating a synthetic {args.year} weather archive for {len(LOCATIONS)} sites...")
+        sites = generate_archive(LOCATIONS, args.year)
+        if args.save_archive:
+            with open(args.save_archive, 'w') as f:
+                json.dump(sites, f)
+            print(f"Saved archive to '{args.save_archive}'")
+
+    report = run_backtest(sites, model_path=args.model, workers=args.workers, chunk_size=args.chunk_size)
+
+    print("\n--- Errors per Site ---")
+    print(report['by_site'])
+    print("\n--- Errors per Month ---")
+    print(report['by_month'])
+    print("\n--- Errors per Hour ---")
+    print(report['by_hour'])
+    print(f"\nOverall MAE: {report['overall']['mae_w']:.2f} Watts, RMSE: {report['overall']['rmse_w']:.2f} Watts")
+
+    print("\n--- Throughput ---")
+    for key, value in report['throughput'].items():
+        print(f"{key}: {value}")
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name in ('by_site', 'by_month', 'by_hour'):
+            report[name].to_csv(os.path.join(args.out, f'backtest_{name}.csv'))
+        print(f"\nSaved error tables to '{args.out}'")
@@ -3,6 +3,17 @@ import numpy as np
 import pvlib
 from tqdm import tqdm
 
+# Define a list of representative cities across India
+LOCATIONS = [
+    {'city': 'Delhi', 'state': 'Delhi', 'latitude': 28.7041, 'longitude': 77.1025, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Mumbai', 'state': 'Maharashtra', 'latitude': 19.0760, 'longitude': 72.8777, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Bangalore', 'state': 'Karnataka', 'latitude': 12.9716, 'longitude': 77.5946, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Kolkata', 'state': 'West Bengal', 'latitude': 22.5726, 'longitude': 88.3639, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Jaipur', 'state': 'Rajasthan', 'latitude': 26.9124, 'longitude': 75.7873, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Chennai', 'state': 'Tamil Nadu', 'latitude': 13.0827, 'longitude': 80.2707, 'timezone': 'Asia/Kolkata'},
+    {'city': 'Bhopal', 'state': 'Madhya Pradesh', 'latitude': 23.2599, 'longitude': 77.4126, 'timezone': 'Asia/Kolkata'},
+]
+
 def generate_solar_data(year, city, state, latitude, longitude, timezone):
     """
     Generates a realistic, year-long, hourly solar power generation dataset for a specific location.
@@ -114,23 +125,12 @@ def generate_solar_data(year, city, state, latitude, longitude, timezone):
 # --- Main Execution Block ---
 if __name__ == '__main__':
     
-    # Define a list of representative cities across India
-    locations = [
-        {'city': 'Delhi', 'state': 'Delhi', 'latitude': 28.7041, 'longitude': 77.1025, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Mumbai', 'state': 'Maharashtra', 'latitude': 19.0760, 'longitude': 72.8777, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Bangalore', 'state': 'Karnataka', 'latitude': 12.9716, 'longitude': 77.5946, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Kolkata', 'state': 'West Bengal', 'latitude': 22.5726, 'longitude': 88.3639, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Jaipur', 'state': 'Rajasthan', 'latitude': 26.9124, 'longitude': 75.7873, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Chennai', 'state': 'Tamil Nadu', 'latitude': 13.0827, 'longitude': 80.2707, 'timezone': 'Asia/Kolkata'},
-        {'city': 'Bhopal', 'state': 'Madhya Pradesh', 'latitude': 23.2599, 'longitude': 77.4126, 'timezone': 'Asia/Kolkata'},
-    ]
-    
     all_dataframes = []
     
     print("Generating solar data for multiple cities across India...")
     
     # Loop through each location and generate its data
-    for location in tqdm(locations, desc="Processing Cities"):
+    for location in tqdm(LOCATIONS, desc="Processing Cities"):
         df = generate_solar_data(
             year=2024,
             city=location['city'],
@@ -0,0 +1,185 @@
+import calendar
+import time
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import pvlib
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional: the kernel only uses NumPy array expressions, so it runs unchanged without it.
+    def njit(**kwargs):
+        return lambda func: func
+
+# Agreement with pvlib's Location.get_solarposition / get_clearsky checked by `compare_with_pvlib`.
+ELEVATION_TOLERANCE_DEG = 0.02
+GHI_TOLERANCE_W_PER_SQ_M = 1.0
+
+_EPOCH = pd.Timestamp('1970-01-01', tz='UTC')
+
+
+def _calendar_month_middles(year):
+    # Mid-month day of year, padded with last December and next January (as pvlib interpolates turbidity).
+    mdays = np.array(calendar.mdays[1:], dtype=float)
+    ydays = 365
+    if calendar.isleap(year):
+        mdays[1] += 1
+        ydays = 366
+    return np.concatenate([[-calendar.mdays[-1] / 2.0], np.cumsum(mdays) - mdays / 2.0,
+                           [ydays + calendar.mdays[1] / 2.0]])
+
+
+_MONTH_MIDDLES_LEAP = _calendar_month_middles(2016)
+_MONTH_MIDDLES_NO_LEAP = _calendar_month_middles(2015)
+
+
+class SiteClimatology(NamedTuple):
+    altitude: float
+    pressure: float
+    linke_turbidity: np.ndarray  # 14 monthly values: Dec, Jan..Dec, Jan
+
+
+@lru_cache(maxsize=None)
+def site_climatology(latitude: float, longitude: float) -> SiteClimatology:
+    """
+    Reads the altitude and monthly Linke turbidity for a site from pvlib's bundled data.
+    Cached, so each site pays the file lookup once instead of on every clear-sky call.
+    """
+    location = pvlib.location.Location(latitude, longitude)
+    months = pd.date_range('2015-01-01', periods=12, freq='MS', tz='UTC')
+    monthly = pvlib.clearsky.lookup_linke_turbidity(months, latitude, longitude, interp_turbidity=False).to_numpy()
+    return SiteClimatology(
+        altitude=float(location.altitude),
+        pressure=float(pvlib.atmosphere.alt2pres(location.altitude)),
+        linke_turbidity=np.concatenate([[monthly[-1]], monthly, [monthly[0]]]).astype(float),
+    )
+
+
+@njit(cache=True, error_model='numpy')
+def _clearsky_kernel(unix_seconds, doy, linke_turbidity, latitude, longitude, altitude, pressure):
+    # --- 1. Solar position (NOAA / Meeus low-precision ephemeris) ---
+    jc = (unix_seconds / 86400.0 + 2440587.5 - 2451545.0) / 36525.0
+    mean_long = (280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360.0
+    mean_anom = np.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    ecc = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    center = (np.sin(mean_anom) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+              + np.sin(2 * mean_anom) * (0.019993 - 0.000101 * jc)
+              + np.sin(3 * mean_anom) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * jc)
+    app_long = np.radians(mean_long + center - 0.00569 - 0.00478 * np.sin(omega))
+    mean_obliq = 23.0 + (26.0 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60.0) / 60.0
+    obliq = np.radians(mean_obliq + 0.00256 * np.cos(omega))
+    decl = np.arcsin(np.sin(obliq) * np.sin(app_long))
+
+    y = np.tan(obliq / 2) ** 2
+    l0 = np.radians(mean_long)
+    eot_minutes = 4 * np.degrees(y * np.sin(2 * l0) - 2 * ecc * np.sin(mean_anom)
+                                 + 4 * ecc * y * np.sin(mean_anom) * np.cos(2 * l0)
+                                 - 0.5 * y * y * np.sin(4 * l0) - 1.25 * ecc * ecc * np.sin(2 * mean_anom))
+    solar_minutes = (unix_seconds % 86400.0) / 60.0 + eot_minutes + 4 * longitude
+    hour_angle = np.radians(solar_minutes / 4 - 180)
+
+    lat = np.radians(latitude)
+    cos_zenith = np.sin(lat) * np.sin(decl) + np.cos(lat) * np.cos(decl) * np.cos(hour_angle)
+    elevation = 90 - np.degrees(np.arccos(np.minimum(np.maximum(cos_zenith, -1.0), 1.0)))
+    # Topocentric parallax, then refraction with the same formula and defaults (12 C) as pvlib's SPA.
+    elevation = elevation - 8.794 / 3600 * np.cos(np.radians(elevation))
+    refraction = np.where(
+        elevation >= -(0.26667 + 0.5667),
+        (pressure / 101000.0) * (283.0 / 285.0) * 1.02
+        / (60.0 * np.tan(np.radians(elevation + 10.3 / (elevation + 5.11)))),
+        0.0,
+    )
+    apparent_elevation = elevation + refraction
+
+    # --- 2. Ineichen-Perez clear-sky GHI ---
+    sun_height = np.maximum(apparent_elevation, 0.0)
+    cos_zenith = np.sin(np.radians(sun_height))
+    airmass = (pressure / 101325.0) / (cos_zenith + 0.50572 * (6.07995 + sun_height) ** -1.6364)
+
+    day_angle = 2 * np.pi * (doy - 1) / 365
+    dni_extra = 1366.1 * (1.00011 + 0.034221 * np.cos(day_angle) + 0.00128 * np.sin(day_angle)
+                          + 0.000719 * np.cos(2 * day_angle) + 7.7e-05 * np.sin(2 * day_angle))
+
+    fh1 = np.exp(-altitude / 8000.0)
+    fh2 = np.exp(-altitude / 1250.0)
+    cg1 = 5.09e-05 * altitude + 0.868
+    cg2 = 3.92e-05 * altitude + 0.0387
+    ghi = cg1 * dni_extra * cos_zenith * np.exp(-cg2 * airmass * (fh1 + fh2 * (linke_turbidity - 1)))
+    ghi = np.where(apparent_elevation > 0, ghi, 0.0)
+
+    return apparent_elevation, ghi
+
+
+def clearsky_ghi(times, latitude: float, longitude: float):
+    """
+    Returns the apparent solar elevation (degrees) and Ineichen clear-sky GHI (W/m^2) for each time.
+    Equivalent to pvlib's Location(latitude, longitude) defaults; naive times are taken as UTC.
+    """
+    times = pd.DatetimeIndex(times)
+    times_utc = times.tz_localize('UTC') if times.tz is None else times.tz_convert('UTC')
+    site = site_climatology(float(latitude), float(longitude))
+
+    unix_seconds = np.asarray((times_utc - _EPOCH) / pd.Timedelta(seconds=1), dtype=float)
+    doy = np.asarray(times_utc.dayofyear, dtype=float)
+    linke_turbidity = np.where(times_utc.is_leap_year,
+                               np.interp(doy, _MONTH_MIDDLES_LEAP, site.linke_turbidity),
+                               np.interp(doy, _MONTH_MIDDLES_NO_LEAP, site.linke_turbidity))
+
+    return _clearsky_kernel(unix_seconds, doy, linke_turbidity, float(latitude), float(longitude),
+                            site.altitude, site.pressure)
+
+
+def compare_with_pvlib(times, latitude: float, longitude: float) -> dict:
+    """
+    Largest absolute differences from pvlib's Location.get_solarposition / get_clearsky for the same times.
+    Elevation is compared while the sun is up; below the horizon the refraction cut-off makes it jump.
+    """
+    location = pvlib.location.Location(latitude, longitude)
+    solar_position = location.get_solarposition(times)
+    clearsky = location.get_clearsky(times, solar_position=solar_position)
+    apparent_elevation, ghi = clearsky_ghi(times, latitude, longitude)
+    pvlib_elevation = solar_position['apparent_elevation'].to_numpy()
+    sun_up = pvlib_elevation > 0
+    return {
+        'apparent_elevation_deg': float(np.max(np.abs(apparent_elevation - pvlib_elevation)[sun_up])),
+        'ghi_w_per_sq_m': float(np.max(np.abs(ghi - clearsky['ghi'].to_numpy()))),
+    }
+
+
+# --- Main Execution Block: validate against pvlib and time a single serving call ---
+if __name__ == '__main__':
+    from generate_data import LOCATIONS
+
+    print("--- Validation against pvlib (2024, 15-minute steps) ---")
+    for location in LOCATIONS:
+        times = pd.date_range('2024-01-01', '2025-01-01', freq='15min', tz=location['timezone'], inclusive='left')
+        diffs = compare_with_pvlib(times, location['latitude'], location['longitude'])
+        ok = (diffs['apparent_elevation_deg'] <= ELEVATION_TOLERANCE_DEG
+              and diffs['ghi_w_per_sq_m'] <= GHI_TOLERANCE_W_PER_SQ_M)
+        print(f"{location['city']:<10} elevation: {diffs['apparent_elevation_deg']:.4f} deg, "
+              f"GHI: {diffs['ghi_w_per_sq_m']:.3f} W/m^2 {'✅' if ok else '❌'}")
+
+    print("\n--- Single-timestamp timing (serving path) ---")
+    latitude, longitude = LOCATIONS[0]['latitude'], LOCATIONS[0]['longitude']
+    times = pd.DatetimeIndex([pd.Timestamp('2024-06-01 12:00', tz='Asia/Kolkata')])
+    clearsky_ghi(times, latitude, longitude)  # compile the kernel and fill the site cache
+    repeats = 200
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pvlib_location = pvlib.location.Location(latitude, longitude)
+        pvlib_location.get_solarposition(times)
+        pvlib_location.get_clearsky(times)
+    pvlib_seconds = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        clearsky_ghi(times, latitude, longitude)
+    fast_seconds = (time.perf_counter() - start) / repeats
+
+    print(f"pvlib: {pvlib_seconds * 1e3:.3f} ms, fast path: {fast_seconds * 1e3:.3f} ms "
+          f"({pvlib_seconds / fast_seconds:.0f}x faster)")
@@ -1,10 +1,11 @@
+import numpy as np
 import pandas as pd
 import requests
 import joblib
-import pvlib
 import pytz
 import os
 from schemas.prediction_schema import LocationData
+from services import irradiance
 import timezonefinder
 
 class SolarPredictionService:
@@ -29,23 +30,32 @@ class SolarPredictionService:
         temperature = weather_data.get('main', {}).get('temp')
         wind_speed = weather_data.get('wind', {}).get('speed')
         cloud_cover = weather_data.get('clouds', {}).get('all')
-        
-        location = pvlib.location.Location(location_data.latitude, location_data.longitude)
-        times = pd.DatetimeIndex([timestamp])
-        solar_position = location.get_solarposition(times)
 
-        estimated_ghi = 0
-        if solar_position['apparent_elevation'].iloc[0] > 0:
-            clearsky = location.get_clearsky(times)
-            estimated_ghi = clearsky['ghi'].iloc[0] * (1 - (cloud_cover or 0) / 110)
-        
-        if estimated_ghi < 0: estimated_ghi = 0
-        
-        return pd.DataFrame([{'Hour_of_Day': timestamp.hour, 'Day_of_Year': timestamp.dayofyear,
+        return self._prepare_features_batch(pd.DatetimeIndex([timestamp]), [temperature], [wind_speed],
+                                            [cloud_cover], location_data)
+
+    def _prepare_features_batch(self, times: pd.DatetimeIndex, temperature, wind_speed, cloud_cover,
+                                location_data: LocationData):
+        """
+        Builds the model feature frame for many timestamps at one location in a single pass.
+        This is the serving feature path; `_prepare_features` is the one-row case of it.
+        """
+        temperature = np.asarray(temperature, dtype=float)
+        wind_speed = np.asarray(wind_speed, dtype=float)
+        cloud_cover = np.asarray(cloud_cover, dtype=float)
+
+        apparent_elevation, clearsky_ghi = irradiance.clearsky_ghi(times, location_data.latitude,
+                                                                   location_data.longitude)
+
+        # Night hours get zero GHI, and missing cloud cover is treated as a clear sky.
+        estimated_ghi = np.where(apparent_elevation > 0, clearsky_ghi * (1 - np.nan_to_num(cloud_cover) / 110), 0.0)
+        estimated_ghi = np.clip(estimated_ghi, 0, None)
+
+        return pd.DataFrame({'Hour_of_Day': times.hour, 'Day_of_Year': times.dayofyear,
             'Latitude': location_data.latitude, 'Longitude': location_data.longitude,
             'Tilt_Angle': location_data.tilt_angle, 'Azimuth_Angle': location_data.azimuth_angle,
             'GHI_W_per_sq_m': estimated_ghi, 'Temperature_C': temperature,
-            'Cloud_Cover_Percent': cloud_cover, 'Wind_Speed_mps': wind_speed}])
+            'Cloud_Cover_Percent': cloud_cover, 'Wind_Speed_mps': wind_speed})
 
     def predict_now(self, api_key: str, location_data: LocationData) -> float:
         url = f"http://api.openweathermap.org/data/2.5/weather?lat={location_data.latitude}&lon={location_data.longitude}&appid={api_key}&units=metric"